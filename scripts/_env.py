@@ -0,0 +1,14 @@
+"""Environment-derived defaults shared by the scripts in this directory."""
+
+from __future__ import annotations
+
+import os
+from functools import cache
+
+DEFAULT_MODEL = "claude-haiku-4-5"
+
+
+@cache
+def server_url() -> str:
+    """URL of the opencode serve instance (``OPENCODE_SERVER_URL``)."""
+    return os.environ.get("OPENCODE_SERVER_URL", "http://127.0.0.1:54321")
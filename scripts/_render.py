@@ -0,0 +1,30 @@
+"""Helpers for printing streamed SDK messages, shared by the scripts here."""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+
+def dispatch(table: dict[type, Callable[..., None]], obj: Any, *args: Any) -> None:
+    """Call the handler for ``type(obj)`` in ``table`` with ``obj, *args``.
+
+    An exact-type dict probe per streamed message/block instead of an
+    isinstance() chain; subclasses fall back to an isinstance scan, and
+    objects with no handler are ignored.
+    """
+    handler = table.get(type(obj))
+    if handler is None:
+        for cls, fn in table.items():
+            if isinstance(obj, cls):
+                handler = fn
+                break
+        else:
+            return
+    handler(obj, *args)
+
+
+def truncate(text: str, limit: int) -> str:
+    """Return ``text`` cut to ``limit`` characters, marking the cut with "..."."""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + "..."
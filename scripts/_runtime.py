@@ -0,0 +1,22 @@
+"""Shared event-loop entry point for the scripts in this directory.
+
+Runs the script's ``main()`` coroutine on uvloop when it is installed
+(``pip install opencode-agent-sdk[uvloop]``) and falls back to the stock
+asyncio loop otherwise, e.g. on Windows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    """Run ``main`` to completion, preferring uvloop's event loop."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main)
+    return uvloop.run(main)
@@ -15,8 +15,8 @@ from __future__ import annotations
 import argparse
 import asyncio
 import json
-import os
 import sys
+from typing import Any, Callable
 
 from opencode_agent_sdk import (
     AgentOptions,
@@ -28,17 +28,195 @@ from opencode_agent_sdk import (
     ToolUseBlock,
 )
 
+from _env import DEFAULT_MODEL, server_url
+from _render import dispatch, truncate
+from _runtime import run
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback when the orjson extra isn't installed
+    orjson = None
+
+
+def _dumps(obj: Any) -> str:
+    """Compact JSON for tool-input rendering, via orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Chat with an LLM via opencode serve")
-    p.add_argument("--model", default="claude-haiku-4-5")
+    p.add_argument("--model", default=DEFAULT_MODEL)
     p.add_argument(
         "--server-url",
-        default=os.environ.get("OPENCODE_SERVER_URL", "http://127.0.0.1:54321"),
+        default=server_url(),
     )
     return p.parse_args()
 
 
+def _write_stdout(chunk: str) -> None:
+    sys.stdout.write(chunk)
+    sys.stdout.flush()
+
+
+class _StreamWriter:
+    """Coalesces terminal output and writes it from a dedicated task.
+
+    Text is buffered until 4 KiB have accumulated or 16 ms have passed since
+    the first buffered piece; a timer flushes the tail of a burst. Flushed
+    text goes to a writer task that does the blocking stdout write in a
+    worker thread, so a slow terminal never stalls the receive loop.
+
+    All response output goes through here to stay ordered. Call
+    ``await drain()`` before writing to stdout directly.
+    """
+
+    __slots__ = ("_pieces", "_size", "_timer", "_queue", "_task")
+
+    _MAX_CHARS = 4096
+    _MAX_DELAY = 0.016
+
+    def __init__(self) -> None:
+        self._pieces: list[str] = []
+        self._size = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._queue: asyncio.Queue[str] = asyncio.Queue(512)
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def write(self, text: str) -> None:
+        self._pieces.append(text)
+        self._size += len(text)
+        if self._size >= self._MAX_CHARS:
+            self.flush()
+        elif self._timer is None:
+            self._schedule_flush()
+
+    def line(self, text: str = "") -> None:
+        self._pieces.append(text + "\n")
+        self.flush()
+
+    def flush(self) -> None:
+        self._cancel_timer()
+        if not self._pieces:
+            return
+        chunk = "".join(self._pieces)
+        try:
+            self._queue.put_nowait(chunk)
+        except asyncio.QueueFull:
+            # Writer is behind; keep coalescing locally and retry shortly.
+            self._pieces[:] = [chunk]
+            self._schedule_flush()
+            return
+        self._pieces.clear()
+        self._size = 0
+
+    def _schedule_flush(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(self._MAX_DELAY, self.flush)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def drain(self) -> None:
+        """Wait until everything written so far has reached stdout."""
+        self._cancel_timer()
+        if self._pieces:
+            await self._queue.put("".join(self._pieces))
+            self._pieces.clear()
+            self._size = 0
+        await self._queue.join()
+
+    async def aclose(self) -> None:
+        await self.drain()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await self._queue.get()
+            try:
+                await loop.run_in_executor(None, _write_stdout, chunk)
+            finally:
+                self._queue.task_done()
+
+
+class _RenderState:
+    """Per-response terminal state shared by the message handlers."""
+
+    __slots__ = ("in_text", "out")
+
+    def __init__(self, out: _StreamWriter) -> None:
+        self.in_text = False
+        self.out = out
+
+
+def _end_text_line(state: _RenderState) -> None:
+    if state.in_text:
+        state.out.line()
+        state.in_text = False
+
+
+def _print_text(block: TextBlock, state: _RenderState) -> None:
+    state.out.write(block.text)
+    state.in_text = True
+
+
+def _print_tool_use(block: ToolUseBlock, state: _RenderState) -> None:
+    _end_text_line(state)
+    state.out.line(
+        f"\x1b[2m[tool: {block.name}"
+        f"({_dumps(block.input)})]\x1b[0m"
+    )
+
+
+def _handle_assistant(msg: AssistantMessage, state: _RenderState) -> None:
+    for block in msg.content:
+        dispatch(BLOCK_HANDLERS, block, state)
+
+
+def _handle_system(msg: SystemMessage, state: _RenderState) -> None:
+    # Non-text events mark a pause in the text stream; don't hold text back.
+    state.out.flush()
+    if msg.subtype == "tool_result":
+        _end_text_line(state)
+        output = msg.data.get("output", "")
+        tool = msg.data.get("tool_name", "unknown")
+        state.out.line(f"\x1b[2m[{tool}] {truncate(output, 300)}\x1b[0m")
+
+
+def _handle_result(msg: ResultMessage, state: _RenderState) -> None:
+    _end_text_line(state)
+    cost = (
+        f"${msg.total_cost_usd:.4f}"
+        if msg.total_cost_usd
+        else "n/a"
+    )
+    state.out.line(f"\x1b[2m({cost} | {msg.num_turns} turns)\x1b[0m")
+
+
+MSG_HANDLERS: dict[type, Callable[[Any, _RenderState], None]] = {
+    AssistantMessage: _handle_assistant,
+    SystemMessage: _handle_system,
+    ResultMessage: _handle_result,
+}
+BLOCK_HANDLERS: dict[type, Callable[[Any, _RenderState], None]] = {
+    TextBlock: _print_text,
+    ToolUseBlock: _print_tool_use,
+}
+
+
 async def main() -> None:
     args = parse_args()
 
@@ -51,6 +229,9 @@ async def main() -> None:
     await client.connect()
     print("Connected. Type 'exit' or 'quit' to end the session.\n")
 
+    out = _StreamWriter()
+    out.start()
+
     try:
         while True:
             try:
@@ -65,54 +246,21 @@ async def main() -> None:
 
             await client.query(user_input)
 
-            in_text = False
+            state = _RenderState(out)
             async for msg in client.receive_response():
-                if isinstance(msg, AssistantMessage):
-                    for block in msg.content:
-                        if isinstance(block, TextBlock):
-                            print(block.text, end="", flush=True)
-                            in_text = True
-                        elif isinstance(block, ToolUseBlock):
-                            if in_text:
-                                print()
-                                in_text = False
-                            print(
-                                f"\x1b[2m[tool: {block.name}"
-                                f"({json.dumps(block.input)})]\x1b[0m"
-                            )
-
-                elif isinstance(msg, SystemMessage):
-                    if msg.subtype == "tool_result":
-                        if in_text:
-                            print()
-                            in_text = False
-                        output = msg.data.get("output", "")
-                        tool = msg.data.get("tool_name", "unknown")
-                        if len(output) > 300:
-                            output = output[:300] + "..."
-                        print(f"\x1b[2m[{tool}] {output}\x1b[0m")
-
-                elif isinstance(msg, ResultMessage):
-                    if in_text:
-                        print()
-                        in_text = False
-                    cost = (
-                        f"${msg.total_cost_usd:.4f}"
-                        if msg.total_cost_usd
-                        else "n/a"
-                    )
-                    print(f"\x1b[2m({cost} | {msg.num_turns} turns)\x1b[0m")
-
-            if in_text:
-                print()
-            print()
+                dispatch(MSG_HANDLERS, msg, state)
+
+            _end_text_line(state)
+            out.line()
+            await out.drain()
 
     except KeyboardInterrupt:
         print()
 
+    await out.aclose()
     print("Disconnecting ...")
     await client.disconnect()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -1,4 +1,3 @@
-import asyncio
 import argparse
 import sys
 import os
@@ -7,6 +6,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), "../src"))
 
 from opencode_agent_sdk.runner import run_agent
+from _runtime import run
 
 async def main():
     parser = argparse.ArgumentParser(description="Seamless Switch Demo")
@@ -19,4 +19,4 @@ async def main():
     print(f"\nFinal Result:\n{result.text}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -8,9 +8,8 @@ Usage:
 
 from __future__ import annotations
 
-import asyncio
 import sys
-import os
+from typing import Any, Callable
 
 from opencode_agent_sdk import (
     AgentOptions,
@@ -22,7 +21,57 @@ from opencode_agent_sdk import (
     ToolUseBlock,
 )
 
-SERVER_URL = os.environ.get("OPENCODE_SERVER_URL", "http://127.0.0.1:54321")
+from _env import DEFAULT_MODEL, server_url
+from _render import dispatch, truncate
+from _runtime import run
+
+SERVER_URL = server_url()
+
+
+def _print_text(block: TextBlock) -> None:
+    print(f"\n  [assistant]\n{block.text}")
+
+
+def _print_tool_use(block: ToolUseBlock) -> None:
+    print(f"\n  [tool_use] {block.name}({block.input})")
+
+
+def _handle_system(msg: SystemMessage, counts: dict[str, int]) -> None:
+    counts["system"] += 1
+    print(f"\n  [system:{msg.subtype}]", end="")
+    if msg.subtype == "tool_result":
+        output = msg.data.get("output", "")
+        tool = msg.data.get("tool_name", "")
+        print(f" {tool} -> {truncate(output, 200)}")
+    else:
+        print()
+
+
+def _handle_assistant(msg: AssistantMessage, counts: dict[str, int]) -> None:
+    counts["assistant"] += 1
+    for block in msg.content:
+        dispatch(BLOCK_HANDLERS, block)
+
+
+def _handle_result(msg: ResultMessage, counts: dict[str, int]) -> None:
+    counts["result"] += 1
+    print(f"\n{'=' * 60}")
+    print(f"  [result] session  = {msg.session_id}")
+    print(f"           cost     = ${msg.total_cost_usd:.6f}")
+    print(f"           turns    = {msg.num_turns}")
+    print(f"           is_error = {msg.is_error}")
+    print(f"{'=' * 60}")
+
+
+MSG_HANDLERS: dict[type, Callable[[Any, dict[str, int]], None]] = {
+    SystemMessage: _handle_system,
+    AssistantMessage: _handle_assistant,
+    ResultMessage: _handle_result,
+}
+BLOCK_HANDLERS: dict[type, Callable[[Any], None]] = {
+    TextBlock: _print_text,
+    ToolUseBlock: _print_tool_use,
+}
 
 
 async def main() -> None:
@@ -33,7 +82,7 @@ async def main() -> None:
 
     options = AgentOptions(
         cwd="/tmp",
-        model="claude-haiku-4-5",
+        model=DEFAULT_MODEL,
         provider_id="anthropic",
         server_url=SERVER_URL,
         max_turns=10,
@@ -70,33 +119,7 @@ async def main() -> None:
     msg_counts = {"system": 0, "assistant": 0, "result": 0}
     try:
         async for msg in client.receive_response():
-            if isinstance(msg, SystemMessage):
-                msg_counts["system"] += 1
-                print(f"\n  [system:{msg.subtype}]", end="")
-                if msg.subtype == "tool_result":
-                    output = msg.data.get("output", "")
-                    tool = msg.data.get("tool_name", "")
-                    preview = output[:200] + "..." if len(output) > 200 else output
-                    print(f" {tool} -> {preview}")
-                else:
-                    print()
-
-            elif isinstance(msg, AssistantMessage):
-                msg_counts["assistant"] += 1
-                for block in msg.content:
-                    if isinstance(block, TextBlock):
-                        print(f"\n  [assistant]\n{block.text}")
-                    elif isinstance(block, ToolUseBlock):
-                        print(f"\n  [tool_use] {block.name}({block.input})")
-
-            elif isinstance(msg, ResultMessage):
-                msg_counts["result"] += 1
-                print(f"\n{'=' * 60}")
-                print(f"  [result] session  = {msg.session_id}")
-                print(f"           cost     = ${msg.total_cost_usd:.6f}")
-                print(f"           turns    = {msg.num_turns}")
-                print(f"           is_error = {msg.is_error}")
-                print(f"{'=' * 60}")
+            dispatch(MSG_HANDLERS, msg, msg_counts)
 
     except Exception as exc:
         print(f"\n[!] receive_response() error: {exc}")
@@ -116,4 +139,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
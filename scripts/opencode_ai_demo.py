@@ -9,11 +9,13 @@ Usage:
   uv run python scripts/opencode_ai_demo.py
 """
 
-import asyncio
 from opencode_ai import AsyncOpencode
 
+from _env import DEFAULT_MODEL, server_url
+from _runtime import run
 
-BASE_URL = "http://localhost:54321"
+
+BASE_URL = server_url()
 
 
 async def main():
@@ -27,9 +29,8 @@ async def main():
     print(f"  Defaults: {providers.default}")
 
     # 2. 创建 session
-    r = await client._client.post("/session")
-    session = r.json()
-    sid = session["id"]
+    session = await client.session.create()
+    sid = session.id
     print(f"\n=== Session created: {sid} ===")
 
     # 3. 发消息 (chat 可能因 opencode DecimalError bug 报错，但 LLM 调用已完成)
@@ -37,7 +38,7 @@ async def main():
     try:
         response = await client.session.chat(
             id=sid,
-            model_id="claude-haiku-4-5",
+            model_id=DEFAULT_MODEL,
             provider_id="anthropic",
             parts=[{"type": "text", "text": "What is 2+2? Reply in one word only."}],
         )
@@ -76,4 +77,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
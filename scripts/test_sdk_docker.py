@@ -15,9 +15,8 @@ Usage:
 
 from __future__ import annotations
 
-import asyncio
-import os
 import sys
+from typing import Any, Callable
 
 from opencode_agent_sdk import (
     AgentOptions,
@@ -29,8 +28,47 @@ from opencode_agent_sdk import (
     ToolUseBlock,
 )
 
+from _env import DEFAULT_MODEL, server_url
+from _render import dispatch
+from _runtime import run
 
-SERVER_URL = os.environ.get("OPENCODE_SERVER_URL", "http://127.0.0.1:54321")
+
+SERVER_URL = server_url()
+
+
+def _print_text(block: TextBlock) -> None:
+    print(f"  [assistant] {block.text}")
+
+
+def _print_tool_use(block: ToolUseBlock) -> None:
+    print(f"  [tool_use]  {block.name}({block.input})")
+
+
+def _handle_system(msg: SystemMessage) -> None:
+    print(f"  [system:{msg.subtype}]")
+
+
+def _handle_assistant(msg: AssistantMessage) -> None:
+    for block in msg.content:
+        dispatch(BLOCK_HANDLERS, block)
+
+
+def _handle_result(msg: ResultMessage) -> None:
+    print(f"\n  [result] session={msg.session_id}")
+    print(f"           cost=${msg.total_cost_usd:.6f}")
+    print(f"           turns={msg.num_turns}")
+    print(f"           error={msg.is_error}")
+
+
+MSG_HANDLERS: dict[type, Callable[[Any], None]] = {
+    SystemMessage: _handle_system,
+    AssistantMessage: _handle_assistant,
+    ResultMessage: _handle_result,
+}
+BLOCK_HANDLERS: dict[type, Callable[[Any], None]] = {
+    TextBlock: _print_text,
+    ToolUseBlock: _print_tool_use,
+}
 
 
 async def main() -> None:
@@ -41,7 +79,7 @@ async def main() -> None:
 
     options = AgentOptions(
         cwd="/workspace",
-        model="claude-haiku-4-5",
+        model=DEFAULT_MODEL,
         provider_id="anthropic",
         server_url=SERVER_URL,
         max_turns=5,
@@ -75,21 +113,7 @@ async def main() -> None:
     # -- Receive response ---------------------------------------
     try:
         async for msg in client.receive_response():
-            if isinstance(msg, SystemMessage):
-                print(f"  [system:{msg.subtype}]")
-
-            elif isinstance(msg, AssistantMessage):
-                for block in msg.content:
-                    if isinstance(block, TextBlock):
-                        print(f"  [assistant] {block.text}")
-                    elif isinstance(block, ToolUseBlock):
-                        print(f"  [tool_use]  {block.name}({block.input})")
-
-            elif isinstance(msg, ResultMessage):
-                print(f"\n  [result] session={msg.session_id}")
-                print(f"           cost=${msg.total_cost_usd:.6f}")
-                print(f"           turns={msg.num_turns}")
-                print(f"           error={msg.is_error}")
+            dispatch(MSG_HANDLERS, msg)
     except Exception as exc:
         print(f"[!] receive_response() error: {exc}")
 
@@ -99,4 +123,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
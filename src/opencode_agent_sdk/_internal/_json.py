@@ -0,0 +1,35 @@
+"""JSON encode/decode for the transports, backed by orjson when installed.
+
+orjson is an optional speed-up (``pip install opencode-agent-sdk[orjson]``).
+Without it the stdlib ``json`` module produces the same compact wire format,
+which also keeps the SDK usable on interpreters where C extensions are a
+poor fit (e.g. PyPy).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes | bytearray | str) -> Any:
+    """Deserialize JSON from bytes or str.
+
+    Raises ``ValueError`` (``json.JSONDecodeError`` or its orjson subclass)
+    on malformed input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -10,7 +10,9 @@ import asyncio
 import logging
 import time
 import uuid
-from typing import Any, AsyncIterator
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Iterator
 
 from ..types import (
     AssistantMessage,
@@ -20,12 +22,27 @@ from ..types import (
     TextBlock,
     ToolUseBlock,
 )
+from . import _json
 from .transport import SubprocessTransport
 
 logger = logging.getLogger(__name__)
 
 _PROTOCOL_VERSION = 1
 
+# Fixed head of every outgoing JSON-RPC message; only the variable members
+# are encoded per call.
+_JSONRPC_PREFIX = b'{"jsonrpc":"2.0",'
+
+
+@dataclass(slots=True)
+class _ToolCallState:
+    """Accumulated state of one tool call across its sessionUpdates."""
+
+    id: str
+    name: str
+    input: dict[str, Any] = field(default_factory=dict)
+    status: str = "pending"
+
 
 class ACPSession:
     """Manages ACP JSON-RPC protocol over a SubprocessTransport."""
@@ -37,17 +54,24 @@ class ACPSession:
     ) -> None:
         self._transport = transport
         self._hooks = hooks or {}
+        # PreToolUse matchers applicable to each tool name, resolved on
+        # first use so permission requests skip the per-matcher checks.
+        self._pre_tool_matchers: dict[str, list[HookMatcher]] = {}
         self._session_id: str = ""
         self._request_id: int = 0
 
         # Message queues for routing
         self._response_futures: dict[int, asyncio.Future[dict[str, Any]]] = {}
         self._update_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        # Updates drained from the queue but not yet processed; kept on the
+        # session so nothing is lost when receive_messages() returns early.
+        self._backlog: deque[dict[str, Any]] = deque()
         self._reader_task: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
 
         # State for accumulating streamed content
         self._text_buffer: str = ""
-        self._tool_calls: dict[str, dict[str, Any]] = {}
+        self._tool_calls: dict[str, _ToolCallState] = {}
         self._prompt_done: bool = False
         self._usage: dict[str, Any] = {}
         self._cost: dict[str, Any] = {}
@@ -69,53 +93,53 @@ class ACPSession:
             "method": method,
             "params": params,
         }
-        future: asyncio.Future[dict[str, Any]] = asyncio.get_event_loop().create_future()
+        loop = self._loop or asyncio.get_running_loop()
+        future: asyncio.Future[dict[str, Any]] = loop.create_future()
         self._response_futures[req_id] = future
         await self._transport.write(msg)
         return await future
 
     async def _send_response(self, req_id: Any, result: dict[str, Any]) -> None:
         """Send a JSON-RPC response (for server->client requests like requestPermission)."""
-        msg = {
-            "jsonrpc": "2.0",
-            "id": req_id,
-            "result": result,
-        }
-        await self._transport.write(msg)
+        await self._transport.write_bytes(
+            _JSONRPC_PREFIX + b'"id":' + _json.dumps(req_id)
+            + b',"result":' + _json.dumps(result) + b"}\n"
+        )
 
     async def _send_notification(self, method: str, params: dict[str, Any]) -> None:
         """Send a JSON-RPC notification (no id, no response expected)."""
-        msg = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params,
-        }
-        await self._transport.write(msg)
+        await self._transport.write_bytes(
+            _JSONRPC_PREFIX + b'"method":' + _json.dumps(method)
+            + b',"params":' + _json.dumps(params) + b"}\n"
+        )
 
     async def start_reader(self) -> None:
         """Start the background reader task that routes incoming messages."""
-        self._reader_task = asyncio.create_task(self._read_loop())
+        self._loop = asyncio.get_running_loop()
+        self._reader_task = self._loop.create_task(self._read_loop())
 
     async def _read_loop(self) -> None:
         """Read messages from transport and route them."""
         try:
             _msg_count = 0
             _first_ts: float | None = None
+            trace = logger.isEnabledFor(logging.INFO)
             async for msg in self._transport.read_messages():
-                _msg_count += 1
-                now = time.monotonic()
-                if _first_ts is None:
-                    _first_ts = now
-                method = msg.get("method", "")
-                if method in ("session/update", "sessionUpdate"):
-                    params = msg.get("params", {})
-                    update = params.get("update", params)
-                    utype = update.get("sessionUpdate", "")
-                    elapsed = now - _first_ts
-                    logger.info(
-                        "ACP msg #%d t=%.3fs type=%s",
-                        _msg_count, elapsed, utype,
-                    )
+                if trace:
+                    _msg_count += 1
+                    now = time.monotonic()
+                    if _first_ts is None:
+                        _first_ts = now
+                    method = msg.get("method", "")
+                    if method in ("session/update", "sessionUpdate"):
+                        params = msg.get("params", {})
+                        update = params.get("update", params)
+                        utype = update.get("sessionUpdate", "")
+                        elapsed = now - _first_ts
+                        logger.info(
+                            "ACP msg #%d t=%.3fs type=%s",
+                            _msg_count, elapsed, utype,
+                        )
                 await self._handle_message(msg)
         except Exception as exc:
             logger.debug("Reader loop ended: %s", exc)
@@ -125,35 +149,55 @@ class ACPSession:
 
     async def _handle_message(self, msg: dict[str, Any]) -> None:
         """Route an incoming JSON-RPC message."""
-        # Response to one of our requests
-        if "id" in msg and ("result" in msg or "error" in msg):
-            req_id = msg["id"]
-            future = self._response_futures.pop(req_id, None)
+        method = msg.get("method")
+
+        # No method: a response to one of our requests
+        if method is None:
+            future = self._response_futures.pop(msg.get("id"), None)
             if future and not future.done():
-                if "error" in msg:
+                error = msg.get("error")
+                if error is not None:
                     future.set_exception(
-                        RuntimeError(f"ACP error: {msg['error']}")
+                        RuntimeError(f"ACP error: {error}")
                     )
                 else:
                     future.set_result(msg.get("result", {}))
             return
 
-        method = msg.get("method", "")
-
-        # Server->Client request: requestPermission
-        if method == "requestPermission" and "id" in msg:
-            await self._handle_permission_request(msg)
-            return
-
-        # Notification: session/update (opencode ACP v1.2.15+)
+        # Notification: session/update (opencode ACP v1.2.15+), checked
+        # first as it makes up nearly all traffic.
         # Also accept legacy "sessionUpdate" for backwards compatibility
         if method in ("session/update", "sessionUpdate"):
             params = msg.get("params", {})
+            update = params.get("update", params)
+            # Drop update types receive_messages() has no handler for
+            # rather than queueing them only to be skipped there.
+            if update.get("sessionUpdate", "") not in self._UPDATE_HANDLERS:
+                logger.debug("Ignoring sessionUpdate: %s", update.get("sessionUpdate"))
+                return
             await self._update_queue.put(params)
             return
 
+        # Server->Client request: requestPermission
+        if method == "requestPermission" and "id" in msg:
+            await self._handle_permission_request(msg)
+            return
+
         logger.debug("Unhandled message: %s", msg)
 
+    def _matchers_for_tool(self, tool_name: str) -> list[HookMatcher]:
+        """Return the PreToolUse matchers that apply to *tool_name*, in order."""
+        matchers = self._pre_tool_matchers.get(tool_name)
+        if matchers is None:
+            # A matcher of None matches all tools
+            matchers = [
+                hook_matcher
+                for hook_matcher in self._hooks.get("PreToolUse", [])
+                if hook_matcher.matcher is None or hook_matcher.matcher == tool_name
+            ]
+            self._pre_tool_matchers[tool_name] = matchers
+        return matchers
+
     async def _handle_permission_request(self, msg: dict[str, Any]) -> None:
         """Handle requestPermission from the server, run PreToolUse hooks."""
         req_id = msg["id"]
@@ -165,19 +209,18 @@ class ACPSession:
         options = params.get("options", [])
 
         # Default: allow once
-        decision_option_id = "once"
+        allow_option_id: str | None = None
+        reject_option_id: str | None = None
         for opt in options:
-            if opt.get("kind") == "allow_once":
-                decision_option_id = opt.get("optionId", "once")
-                break
+            kind = opt.get("kind")
+            if kind == "allow_once" and allow_option_id is None:
+                allow_option_id = opt.get("optionId", "once")
+            elif kind == "reject_once" and reject_option_id is None:
+                reject_option_id = opt.get("optionId", "reject")
+        decision_option_id = "once" if allow_option_id is None else allow_option_id
 
         # Run PreToolUse hooks if any
-        pre_tool_hooks = self._hooks.get("PreToolUse", [])
-        for hook_matcher in pre_tool_hooks:
-            # Check if matcher matches tool name (None matches all)
-            if hook_matcher.matcher is not None and hook_matcher.matcher != tool_name:
-                continue
-
+        for hook_matcher in self._matchers_for_tool(tool_name):
             hook_input = {
                 "hook_event_name": "PreToolUse",
                 "tool_name": tool_name,
@@ -199,13 +242,9 @@ class ACPSession:
                     if isinstance(result, dict):
                         decision = result.get("permissionDecision", "")
                         if decision == "deny":
-                            # Find reject option
-                            for opt in options:
-                                if opt.get("kind") == "reject_once":
-                                    decision_option_id = opt.get("optionId", "reject")
-                                    break
-                            else:
-                                decision_option_id = "reject"
+                            decision_option_id = (
+                                "reject" if reject_option_id is None else reject_option_id
+                            )
                             break
                 except Exception:
                     logger.exception("Hook error for tool %s", tool_name)
@@ -321,19 +360,27 @@ class ACPSession:
 
     async def receive_messages(self) -> AsyncIterator[SystemMessage | AssistantMessage | ResultMessage]:
         """Async generator yielding translated messages from sessionUpdate notifications."""
+        queue = self._update_queue
+        backlog = self._backlog
         while True:
-            update = await self._update_queue.get()
+            if not backlog:
+                # Wait for one update, then take whatever else has already
+                # arrived so a burst costs a single event-loop wakeup.
+                backlog.append(await queue.get())
+                while True:
+                    try:
+                        backlog.append(queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+            update = backlog.popleft()
 
             if update.get("_eof"):
                 return
 
             if update.get("_prompt_done"):
                 # Flush any accumulated text
-                if self._text_buffer:
-                    yield AssistantMessage(
-                        content=[TextBlock(text=self._text_buffer)]
-                    )
-                    self._text_buffer = ""
+                for message in self._flush_text():
+                    yield message
 
                 # Yield final result message
                 result_data = update.get("_result", {})
@@ -352,86 +399,152 @@ class ACPSession:
 
             session_update = update.get("update", update)
             update_type = session_update.get("sessionUpdate", "")
+            if update_type == "agent_message_chunk" and backlog:
+                session_update = self._coalesce_text_chunks(session_update)
+            handler = self._UPDATE_HANDLERS.get(update_type)
+            if handler is not None:
+                for message in handler(self, session_update):
+                    yield message
+
+    # ------------------------------------------------------------------
+    # sessionUpdate handlers, dispatched by update type
+    # ------------------------------------------------------------------
+
+    def _coalesce_text_chunks(
+        self, session_update: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Merge text chunks queued right after *session_update* into one.
+
+        Consumers replace their display with the accumulated text, so a
+        run of chunks that has already arrived only needs a single yield.
+        """
+        backlog = self._backlog
+        texts = [session_update.get("content", {}).get("text", "")]
+        while backlog:
+            nxt = backlog[0]
+            nxt_update = nxt.get("update", nxt)
+            if nxt_update.get("sessionUpdate") != "agent_message_chunk":
+                break
+            texts.append(nxt_update.get("content", {}).get("text", ""))
+            backlog.popleft()
+        if len(texts) == 1:
+            return session_update
+        return {
+            "sessionUpdate": "agent_message_chunk",
+            "content": {"type": "text", "text": "".join(texts)},
+        }
 
-            if update_type == "agent_message_chunk":
-                content = session_update.get("content", {})
-                text = content.get("text", "")
-                if text:
-                    self._text_buffer += text
-                    # Yield the full accumulated text so consumers can replace
-                    # their display (bot does accumulated_text = text, not +=)
-                    yield AssistantMessage(
-                        content=[TextBlock(text=self._text_buffer)]
-                    )
-
-            elif update_type == "tool_call":
-                tool_call_id = session_update.get("toolCallId", "")
-                tool_name = session_update.get("title", "")
-                self._tool_calls[tool_call_id] = {
-                    "id": tool_call_id,
-                    "name": tool_name,
-                    "input": session_update.get("rawInput", {}),
-                    "status": session_update.get("status", "pending"),
-                }
-                # Flush text buffer before tool starts so consumers see
-                # accumulated text immediately rather than after tool completes
-                if self._text_buffer:
-                    yield AssistantMessage(
-                        content=[TextBlock(text=self._text_buffer)]
-                    )
-                    self._text_buffer = ""
-
-            elif update_type == "tool_call_update":
-                tool_call_id = session_update.get("toolCallId", "")
-                status = session_update.get("status", "")
-
-                if tool_call_id in self._tool_calls:
-                    self._tool_calls[tool_call_id]["status"] = status
-                    self._tool_calls[tool_call_id]["input"] = session_update.get(
-                        "rawInput", self._tool_calls[tool_call_id].get("input", {})
-                    )
-
-                if status in ("completed", "failed"):
-                    # Flush text buffer before yielding tool use
-                    if self._text_buffer:
-                        yield AssistantMessage(
-                            content=[TextBlock(text=self._text_buffer)]
-                        )
-                        self._text_buffer = ""
-
-                    tc = self._tool_calls.get(tool_call_id, {})
-                    yield AssistantMessage(
-                        content=[
-                            ToolUseBlock(
-                                id=tool_call_id,
-                                name=tc.get("name", session_update.get("title", "")),
-                                input=tc.get("input", {}),
-                            )
-                        ]
-                    )
-
-            elif update_type == "usage_update":
-                self._usage = {
-                    "used": session_update.get("used", 0),
-                    "size": session_update.get("size", 0),
-                }
-                cost = session_update.get("cost", {})
-                if cost:
-                    self._cost = cost
-
-            elif update_type == "plan":
-                yield SystemMessage(
-                    subtype="plan",
-                    data={"entries": session_update.get("entries", [])},
+    def _flush_text(self) -> Iterator[AssistantMessage]:
+        """Yield and clear any accumulated response text."""
+        if self._text_buffer:
+            yield AssistantMessage(
+                content=[TextBlock(text=self._text_buffer)]
+            )
+            self._text_buffer = ""
+
+    def _on_agent_message_chunk(
+        self, session_update: dict[str, Any],
+    ) -> Iterator[AssistantMessage]:
+        content = session_update.get("content", {})
+        text = content.get("text", "")
+        if text:
+            self._text_buffer += text
+            # Yield the full accumulated text so consumers can replace
+            # their display (bot does accumulated_text = text, not +=)
+            yield AssistantMessage(
+                content=[TextBlock(text=self._text_buffer)]
+            )
+
+    def _on_tool_call(
+        self, session_update: dict[str, Any],
+    ) -> Iterator[AssistantMessage]:
+        tool_call_id = session_update.get("toolCallId", "")
+        tool_name = session_update.get("title", "")
+        self._tool_calls[tool_call_id] = _ToolCallState(
+            id=tool_call_id,
+            name=tool_name,
+            input=session_update.get("rawInput", {}),
+            status=session_update.get("status", "pending"),
+        )
+        # Flush text buffer before tool starts so consumers see
+        # accumulated text immediately rather than after tool completes
+        yield from self._flush_text()
+
+    def _on_tool_call_update(
+        self, session_update: dict[str, Any],
+    ) -> Iterator[AssistantMessage]:
+        tool_call_id = session_update.get("toolCallId", "")
+        status = session_update.get("status", "")
+
+        tc = self._tool_calls.get(tool_call_id)
+        if tc is not None:
+            tc.status = status
+            tc.input = session_update.get("rawInput", tc.input)
+
+        if status in ("completed", "failed"):
+            # Flush text buffer before yielding tool use
+            yield from self._flush_text()
+
+            if tc is None:
+                tc = _ToolCallState(
+                    id=tool_call_id, name=session_update.get("title", ""),
                 )
-
-            elif update_type == "agent_thought_chunk":
-                # Yield thinking text as AssistantMessage so consumers can
-                # stream it without needing to handle SystemMessage separately.
-                # Kept separate from _text_buffer to avoid mixing with response text.
-                content = session_update.get("content", {})
-                text = content.get("text", "")
-                if text:
-                    yield AssistantMessage(
-                        content=[TextBlock(text=text)]
+            yield AssistantMessage(
+                content=[
+                    ToolUseBlock(
+                        id=tool_call_id,
+                        name=tc.name,
+                        input=tc.input,
                     )
+                ]
+            )
+
+    def _on_usage_update(
+        self, session_update: dict[str, Any],
+    ) -> Iterator[AssistantMessage]:
+        self._usage = {
+            "used": session_update.get("used", 0),
+            "size": session_update.get("size", 0),
+        }
+        cost = session_update.get("cost", {})
+        if cost:
+            self._cost = cost
+        return iter(())
+
+    def _on_plan(
+        self, session_update: dict[str, Any],
+    ) -> Iterator[SystemMessage]:
+        yield SystemMessage(
+            subtype="plan",
+            data={"entries": session_update.get("entries", [])},
+        )
+
+    def _on_agent_thought_chunk(
+        self, session_update: dict[str, Any],
+    ) -> Iterator[AssistantMessage]:
+        # Yield thinking text as AssistantMessage so consumers can
+        # stream it without needing to handle SystemMessage separately.
+        # Kept separate from _text_buffer to avoid mixing with response text.
+        content = session_update.get("content", {})
+        text = content.get("text", "")
+        if text:
+            yield AssistantMessage(
+                content=[TextBlock(text=text)]
+            )
+
+    # Resolved once at class creation; receive_messages() does one dict
+    # lookup per update instead of walking an if/elif chain.
+    _UPDATE_HANDLERS: dict[
+        str,
+        Callable[
+            [ACPSession, dict[str, Any]],
+            Iterator[SystemMessage | AssistantMessage],
+        ],
+    ] = {
+        "agent_message_chunk": _on_agent_message_chunk,
+        "tool_call": _on_tool_call,
+        "tool_call_update": _on_tool_call_update,
+        "usage_update": _on_usage_update,
+        "plan": _on_plan,
+        "agent_thought_chunk": _on_agent_thought_chunk,
+    }
@@ -11,34 +11,93 @@ Supports two modes:
 from __future__ import annotations
 
 import asyncio
-import json
+import importlib.util
 import logging
-from typing import Any, AsyncIterator
+import re
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator
 
 import httpx
 
 from .._errors import ProcessError
+from . import _json
 from ..types import (
     AssistantMessage,
     ResultMessage,
     SystemMessage,
     TextBlock,
     ToolUseBlock,
+    Usage,
 )
 
 logger = logging.getLogger(__name__)
 
+# Messages buffered between the SSE reader task and the consumer; roughly one
+# tool turn's worth of parts.
+_STREAM_QUEUE_SIZE = 64
+_STREAM_END = object()
+
+_SSE_TIMEOUT = httpx.Timeout(None, connect=10.0)
+
+# HTTP/2 needs the optional h2 package (``pip install opencode-agent-sdk[http2]``).
+# httpx only negotiates it over TLS, so plain-http local servers stay on 1.1.
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_JSON_CONTENT = {"Content-Type": "application/json"}
+
+# Event boundary (a blank line, LF or CRLF) and the payload of a data: line.
+_SSE_EVENT_END = re.compile(rb"\r?\n\r?\n")
+_SSE_DATA_LINE = re.compile(rb"^data:[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
+
+
+def _decode_sse_event(raw: bytes) -> dict[str, Any] | None:
+    """Decode the ``data:`` payload of one SSE event, or None if absent/invalid."""
+    data_lines = _SSE_DATA_LINE.findall(raw)
+    if not data_lines:
+        return None
+    try:
+        return _json.loads(b"\n".join(data_lines))
+    except ValueError:
+        return None
+
+
+def _failed(task: asyncio.Task[Any]) -> bool:
+    """True if *task* finished by raising (not by cancellation)."""
+    return task.done() and not task.cancelled() and task.exception() is not None
+
 
 class HTTPTransport:
     """Communicates with opencode serve via its REST API."""
 
-    def __init__(self, base_url: str, timeout: float = 120.0) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 120.0,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        """Create a transport for the opencode server at ``base_url``.
+
+        Pass ``client`` to share one connection pool between several
+        transports. It must already be configured with the server as its
+        ``base_url``; the transport uses it as-is and leaves closing it to
+        the caller. ``SDKClient`` passes ``AgentOptions.http_client`` here.
+        """
         self._base_url = base_url.rstrip("/")
-        self._client = httpx.AsyncClient(
-            base_url=self._base_url,
-            timeout=httpx.Timeout(timeout, connect=10.0),
-            headers={"Accept": "application/json"},
-        )
+        self._owns_client = client is None
+        if client is None:
+            # One pooled client for the transport's lifetime so every REST
+            # call reuses a kept-alive connection instead of reconnecting.
+            client = httpx.AsyncClient(
+                base_url=self._base_url,
+                timeout=httpx.Timeout(timeout, connect=10.0),
+                headers={"Accept": "application/json"},
+                limits=httpx.Limits(
+                    max_keepalive_connections=16,
+                    max_connections=32,
+                    keepalive_expiry=60.0,
+                ),
+                http2=_HTTP2,
+            )
+        self._client = client
         self._session_id: str = ""
 
     @property
@@ -49,7 +108,7 @@ class HTTPTransport:
         """Create a new session on the opencode server."""
         resp = await self._client.post("/session")
         resp.raise_for_status()
-        data = resp.json()
+        data = _json.loads(resp.content)
         self._session_id = data["id"]
         logger.debug("Created session: %s", self._session_id)
 
@@ -73,10 +132,11 @@ class HTTPTransport:
 
         resp = await self._client.post(
             f"/session/{self._session_id}/message",
-            json=body,
+            content=_json.dumps(body),
+            headers=_JSON_CONTENT,
         )
         resp.raise_for_status()
-        data = resp.json()
+        data = _json.loads(resp.content)
         return data.get("parts", [])
 
     async def get_messages(self) -> list[dict[str, Any]]:
@@ -86,16 +146,17 @@ class HTTPTransport:
 
         resp = await self._client.get(f"/session/{self._session_id}/messages")
         resp.raise_for_status()
-        return resp.json()
+        return _json.loads(resp.content)
 
     async def close(self) -> None:
-        """Delete the session and close the HTTP client."""
+        """Delete the session and close the HTTP client if we created it."""
         if self._session_id:
             try:
                 await self._client.delete(f"/session/{self._session_id}")
             except Exception:
                 logger.debug("Failed to delete session %s", self._session_id)
-        await self._client.aclose()
+        if self._owns_client:
+            await self._client.aclose()
 
     # ------------------------------------------------------------------
     # Streaming via SSE
@@ -121,140 +182,233 @@ class HTTPTransport:
         if provider_id:
             body["providerID"] = provider_id
 
-        seen_text: dict[str, str] = {}      # part_id → full text seen
+        seen_len: dict[str, int] = {}       # part_id → length of text seen
         tool_states: dict[str, str] = {}    # part_id → last processed status
         session_id = self._session_id
 
-        async with httpx.AsyncClient(
-            base_url=self._base_url,
-            timeout=httpx.Timeout(None, connect=10.0),
-        ) as sse_client:
-            async with sse_client.stream(
-                "GET", "/event",
-                headers={"Accept": "text/event-stream"},
-            ) as sse_response:
-                # Fire chat POST in the background
-                send_task = asyncio.create_task(
-                    self._client.post(
-                        f"/session/{self._session_id}/message",
-                        json=body,
-                    )
+        # The event stream stays open for the whole turn, so it gets no read
+        # timeout; it shares the pooled client with the POST below.
+        async with self._client.stream(
+            "GET", "/event",
+            headers={"Accept": "text/event-stream"},
+            timeout=_SSE_TIMEOUT,
+        ) as sse_response:
+            # Fire chat POST in the background
+            send_task = asyncio.create_task(
+                self._post_message(session_id, body)
+            )
+            # Read and translate events in a second task so network reads
+            # and SSE parsing overlap with the consumer's per-message work.
+            queue: asyncio.Queue[Any] = asyncio.Queue(
+                maxsize=_STREAM_QUEUE_SIZE,
+            )
+            reader_task = asyncio.create_task(
+                self._pump_events(
+                    sse_response, queue, session_id, seen_len, tool_states,
+                    send_task,
                 )
+            )
+            # A rejected POST means no session.idle will follow; stop the
+            # reader so it hands the POST's error to the consumer instead.
+            def _stop_reader(task: asyncio.Task[None]) -> None:
+                if _failed(task):
+                    reader_task.cancel()
+
+            send_task.add_done_callback(_stop_reader)
 
-                try:
-                    async for event in self._parse_sse(sse_response):
-                        event_type = event.get("type", "")
-                        props = event.get("properties", {})
-
-                        if event_type == "message.part.updated":
-                            part = props.get("part", {})
-                            if part.get("sessionID") != session_id:
-                                continue
-                            msg = self._translate_sse_part(
-                                part, seen_text, tool_states,
-                            )
-                            if msg is not None:
-                                yield msg
-
-                        elif event_type == "session.idle":
-                            if props.get("sessionID") == session_id:
-                                break
-
-                        elif event_type == "session.error":
-                            if props.get("sessionID") == session_id:
-                                error = props.get("error")
-                                name = "UnknownError"
-                                if isinstance(error, dict):
-                                    name = error.get("name", name)
-                                raise ProcessError(
-                                    f"Session error: {name}",
-                                    exit_code=1,
-                                )
-                finally:
-                    if not send_task.done():
-                        send_task.cancel()
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is _STREAM_END:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield item
+                # Surface an HTTP error from the POST even if the event
+                # stream itself ended cleanly.
+                await send_task
+            finally:
+                for task in (reader_task, send_task):
+                    if not task.done():
+                        task.cancel()
                     try:
-                        await send_task
-                    except (asyncio.CancelledError, Exception):
+                        await task
+                    except asyncio.CancelledError:
                         pass
+                    except Exception:
+                        # Already raised to the consumer, or the consumer
+                        # stopped iterating before the turn finished.
+                        logger.debug("chat_stream task failed", exc_info=True)
+
+    async def _post_message(self, session_id: str, body: dict[str, Any]) -> None:
+        """POST a chat message, raising ProcessError if the server rejects it."""
+        try:
+            # The server only answers once the assistant turn is over, so
+            # like the event stream this gets no read timeout.
+            resp = await self._client.post(
+                f"/session/{session_id}/message",
+                content=_json.dumps(body),
+                headers=_JSON_CONTENT,
+                timeout=_SSE_TIMEOUT,
+            )
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            raise ProcessError(
+                f"Failed to send message: HTTP {exc.response.status_code}",
+                exit_code=1,
+            ) from exc
+        except httpx.HTTPError as exc:
+            raise ProcessError(
+                f"Failed to send message: {exc}",
+                exit_code=1,
+            ) from exc
+
+    async def _pump_events(
+        self,
+        sse_response: httpx.Response,
+        queue: asyncio.Queue[Any],
+        session_id: str,
+        seen_len: dict[str, int],
+        tool_states: dict[str, str],
+        send_task: asyncio.Task[None],
+    ) -> None:
+        """Translate SSE events for ``session_id`` into SDK messages on ``queue``.
+
+        Ends the stream with ``_STREAM_END`` on ``session.idle`` (or EOF), or
+        with the raised exception so the consumer can re-raise it. If
+        ``send_task`` fails, the reader is cancelled and forwards its error.
+        """
+        try:
+            async for event in self._parse_sse(sse_response):
+                event_type = event.get("type", "")
+                props = event.get("properties", {})
+
+                if event_type == "message.part.updated":
+                    part = props.get("part", {})
+                    if part.get("sessionID") != session_id:
+                        continue
+                    msg = self._translate_sse_part(
+                        part, seen_len, tool_states,
+                    )
+                    if msg is not None:
+                        await queue.put(msg)
+
+                elif event_type == "session.idle":
+                    if props.get("sessionID") == session_id:
+                        break
+
+                elif event_type == "session.error":
+                    if props.get("sessionID") == session_id:
+                        error = props.get("error")
+                        name = "UnknownError"
+                        if isinstance(error, dict):
+                            name = error.get("name", name)
+                        raise ProcessError(
+                            f"Session error: {name}",
+                            exit_code=1,
+                        )
+        except asyncio.CancelledError:
+            if not _failed(send_task):
+                raise
+            await queue.put(send_task.exception())
+            return
+        except Exception as exc:
+            await queue.put(exc)
+            return
+        await queue.put(_STREAM_END)
 
     @staticmethod
     async def _parse_sse(
         response: httpx.Response,
     ) -> AsyncIterator[dict[str, Any]]:
-        """Parse Server-Sent Events from an httpx streaming response."""
-        data_lines: list[str] = []
-
-        async for line in response.aiter_lines():
-            if line.startswith("data:"):
-                data_lines.append(line[5:].strip())
-            elif line == "":
-                if data_lines:
-                    raw = "\n".join(data_lines)
-                    try:
-                        yield json.loads(raw)
-                    except json.JSONDecodeError:
-                        pass
-                data_lines = []
+        """Parse Server-Sent Events from an httpx streaming response.
+
+        Frames events on blank lines at the bytes level as each network read
+        arrives, so a read carrying many events is split in one pass instead
+        of decoding and dispatching it line by line. Reads are not batched:
+        ``/event`` never closes, so holding data back would stall the turn.
+        """
+        buf = bytearray()
+        find_end = _SSE_EVENT_END.search
+        async for chunk in response.aiter_bytes():
+            # Only the tail of the previous data can complete a boundary;
+            # back up far enough to catch a CRLF CRLF split across reads.
+            scan = max(len(buf) - 3, 0)
+            buf += chunk
+            start = 0
+            while True:
+                match = find_end(buf, scan)
+                if match is None:
+                    break
+                event = _decode_sse_event(bytes(buf[start:match.start()]))
+                start = scan = match.end()
+                if event is not None:
+                    yield event
+            if start:
+                del buf[:start]
 
     def _translate_sse_part(
         self,
         part: dict[str, Any],
-        seen_text: dict[str, str],
+        seen_len: dict[str, int],
         tool_states: dict[str, str],
     ) -> SystemMessage | AssistantMessage | ResultMessage | None:
         """Translate a single SSE part update into an SDK message."""
-        part_type = part.get("type", "")
-        part_id = part.get("id", "")
+        part_get = part.get
+        part_type = part_get("type", "")
+        part_id = part_get("id", "")
 
         if part_type == "text":
-            full = part.get("text", "")
-            prev = seen_text.get(part_id, "")
-            delta = full[len(prev):]
-            seen_text[part_id] = full
+            full = part_get("text", "")
+            delta = full[seen_len.get(part_id, 0):]
+            seen_len[part_id] = len(full)
             if delta:
                 return AssistantMessage(content=[TextBlock(text=delta)])
 
         elif part_type == "tool":
-            state = part.get("state", {})
-            status = state.get("status", "")
-            prev_status = tool_states.get(part_id, "")
-            tool_name = part.get("tool", "")
-
-            if status == "running" and prev_status != "running":
+            state = part_get("state", {})
+            state_get = state.get
+            status = state_get("status", "")
+            # Repeated updates for a status already handled carry nothing new
+            if status == tool_states.get(part_id, ""):
+                return None
+            tool_name = part_get("tool", "")
+            call_id = part_get("callID", part_id)
+
+            if status == "running":
                 tool_states[part_id] = "running"
-                tool_input = state.get("input")
+                tool_input = state_get("input")
                 return AssistantMessage(
                     content=[
                         ToolUseBlock(
-                            id=part.get("callID", part_id),
+                            id=call_id,
                             name=tool_name,
                             input=tool_input if isinstance(tool_input, dict) else {},
                         )
                     ]
                 )
 
-            if status == "completed" and prev_status != "completed":
+            if status == "completed":
                 tool_states[part_id] = "completed"
                 return SystemMessage(
                     subtype="tool_result",
                     data={
                         "tool_name": tool_name,
-                        "tool_id": part.get("callID", part_id),
-                        "output": state.get("output", ""),
-                        "title": state.get("title", ""),
-                        "input": state.get("input", {}),
+                        "tool_id": call_id,
+                        "output": state_get("output", ""),
+                        "title": state_get("title", ""),
+                        "input": state_get("input", {}),
                     },
                 )
 
-            if status == "error" and prev_status != "error":
+            if status == "error":
                 tool_states[part_id] = "error"
                 return SystemMessage(
                     subtype="tool_error",
                     data={
                         "tool_name": tool_name,
-                        "tool_id": part.get("callID", part_id),
-                        "error": str(state.get("error", state)),
+                        "tool_id": call_id,
+                        "error": str(state_get("error", state)),
                     },
                 )
 
@@ -262,8 +416,7 @@ class HTTPTransport:
             return SystemMessage(subtype="step_start", data=part)
 
         elif part_type == "step-finish":
-            tokens = part.get("tokens", {})
-            from ..types import Usage
+            tokens = part_get("tokens", {})
             usage = Usage(
                 input_tokens=int(tokens.get("input", 0)),
                 output_tokens=int(tokens.get("output", 0)),
@@ -272,8 +425,8 @@ class HTTPTransport:
             )
             return ResultMessage(
                 usage=usage,
-                total_cost_usd=part.get("cost", 0.0),
-                session_id=part.get("sessionID", self._session_id),
+                total_cost_usd=part_get("cost", 0.0),
+                session_id=part_get("sessionID", self._session_id),
                 duration_ms=0.0,
                 num_turns=1,
                 is_error=False,
@@ -289,71 +442,95 @@ class HTTPTransport:
         self, parts: list[dict[str, Any]]
     ) -> list[SystemMessage | AssistantMessage | ResultMessage]:
         """Translate opencode response parts into SDK message types."""
-        messages: list[SystemMessage | AssistantMessage | ResultMessage] = []
+        return list(self.itranslate_parts(parts))
 
+    def itranslate_parts(
+        self, parts: Iterable[dict[str, Any]]
+    ) -> Iterator[SystemMessage | AssistantMessage | ResultMessage]:
+        """Lazily translate opencode response parts, one message per known part."""
+        handlers = _PART_HANDLERS
         for part in parts:
-            part_type = part.get("type", "")
+            handler = handlers.get(part.get("type", ""))
+            if handler is not None:
+                yield handler(part)
 
-            if part_type == "text":
-                messages.append(
-                    AssistantMessage(content=[TextBlock(text=part.get("text", ""))])
-                )
 
-            elif part_type == "tool-invocation":
-                tool_id = part.get("toolInvocationId", part.get("id", ""))
-                tool_name = part.get("toolName", "")
-                tool_input = part.get("input", {})
-                messages.append(
-                    AssistantMessage(
-                        content=[
-                            ToolUseBlock(
-                                id=tool_id,
-                                name=tool_name,
-                                input=tool_input if isinstance(tool_input, dict) else {},
-                            )
-                        ]
-                    )
-                )
+# ----------------------------------------------------------------------
+# Non-streaming part translators, dispatched by part type
+# ----------------------------------------------------------------------
 
-            elif part_type == "tool-result":
-                tool_id = part.get("toolInvocationId", part.get("id", ""))
-                tool_name = part.get("toolName", "")
-                result_parts = part.get("result", [])
-                result_text = ""
-                if isinstance(result_parts, list):
-                    for rp in result_parts:
-                        if isinstance(rp, dict) and rp.get("type") == "text":
-                            result_text += rp.get("text", "")
-                elif isinstance(result_parts, str):
-                    result_text = result_parts
-                messages.append(
-                    SystemMessage(
-                        subtype="tool_result",
-                        data={
-                            "tool_name": tool_name,
-                            "tool_id": tool_id,
-                            "output": result_text,
-                        },
-                    )
-                )
+def _tool_id(part: dict[str, Any]) -> str:
+    """A tool part's invocation id, falling back to its part id."""
+    tool_id = part.get("toolInvocationId")
+    return part.get("id", "") if tool_id is None else tool_id
 
-            elif part_type == "step-start":
-                messages.append(
-                    SystemMessage(subtype="step_start", data=part)
-                )
 
-            elif part_type == "step-finish":
-                tokens = part.get("tokens", {})
-                cost = part.get("cost", 0.0)
-                messages.append(
-                    ResultMessage(
-                        usage=tokens,
-                        total_cost_usd=cost,
-                        session_id=part.get("sessionID", ""),
-                        duration_ms=0.0,
-                        num_turns=1,
-                        is_error=False,
-                    )
-                )
+def _text_part(part: dict[str, Any]) -> AssistantMessage:
+    return AssistantMessage(content=[TextBlock(text=part.get("text", ""))])
 
-        return messages
+
+def _tool_invocation_part(part: dict[str, Any]) -> AssistantMessage:
+    tool_id = _tool_id(part)
+    tool_name = part.get("toolName", "")
+    tool_input = part.get("input", {})
+    return AssistantMessage(
+        content=[
+            ToolUseBlock(
+                id=tool_id,
+                name=tool_name,
+                input=tool_input if isinstance(tool_input, dict) else {},
+            )
+        ]
+    )
+
+
+def _tool_result_part(part: dict[str, Any]) -> SystemMessage:
+    tool_id = _tool_id(part)
+    tool_name = part.get("toolName", "")
+    result_parts = part.get("result", [])
+    result_text = ""
+    if isinstance(result_parts, list):
+        result_text = "".join([
+            rp.get("text", "")
+            for rp in result_parts
+            if isinstance(rp, dict) and rp.get("type") == "text"
+        ])
+    elif isinstance(result_parts, str):
+        result_text = result_parts
+    return SystemMessage(
+        subtype="tool_result",
+        data={
+            "tool_name": tool_name,
+            "tool_id": tool_id,
+            "output": result_text,
+        },
+    )
+
+
+def _step_start_part(part: dict[str, Any]) -> SystemMessage:
+    return SystemMessage(subtype="step_start", data=part)
+
+
+def _step_finish_part(part: dict[str, Any]) -> ResultMessage:
+    tokens = part.get("tokens", {})
+    cost = part.get("cost", 0.0)
+    return ResultMessage(
+        usage=tokens,
+        total_cost_usd=cost,
+        session_id=part.get("sessionID", ""),
+        duration_ms=0.0,
+        num_turns=1,
+        is_error=False,
+    )
+
+
+_PART_HANDLERS: dict[
+    str,
+    Callable[[dict[str, Any]], SystemMessage | AssistantMessage | ResultMessage],
+] = {
+    "text": _text_part,
+    "tool-invocation": _tool_invocation_part,
+    "tool-result": _tool_result_part,
+    "step-start": _step_start_part,
+    "step-finish": _step_finish_part,
+}
@@ -1,22 +1,53 @@
 from __future__ import annotations
 
-import json
+import functools
 import logging
 import os
 import shutil
 import subprocess
-from typing import Any, AsyncIterator
+from typing import Any, AsyncIterable, AsyncIterator
 
 import anyio
 import anyio.abc
 
 from .._errors import ProcessError
+from . import _json
 
 logger = logging.getLogger(__name__)
 
 
+async def _iter_lines(stream: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Yield the newline-terminated lines of a byte stream, without the newline.
+
+    Each chunk is split once, so a read carrying many lines costs one scan
+    rather than one split-and-copy of the remaining buffer per line. A
+    line spanning many reads (a large tool result) is extended in place
+    in a bytearray instead of being re-copied on every read. An
+    unterminated trailing line is discarded at EOF.
+    """
+    pending = bytearray()
+    async for chunk in stream:
+        end = chunk.rfind(b"\n")
+        if end == -1:
+            pending += chunk
+            continue
+        if pending:
+            pending += chunk[:end]
+            lines = bytes(pending).split(b"\n")
+        else:
+            lines = chunk[:end].split(b"\n")
+        pending = bytearray(chunk[end + 1:])
+        for line in lines:
+            yield line
+
+
+@functools.cache
 def _find_opencode_binary() -> str:
-    """Find the opencode binary on the system."""
+    """Find the opencode binary on the system.
+
+    The result is cached for the process; a failed lookup raises and is
+    retried on the next call.
+    """
     # Check PATH first
     found = shutil.which("opencode")
     if found:
@@ -73,23 +104,19 @@ class SubprocessTransport:
         """
         if self._process is None or self._process.stderr is None:
             return
-        buffer = b""
         try:
-            async for chunk in self._process.stderr:
-                buffer += chunk
-                while b"\n" in buffer:
-                    line_bytes, buffer = buffer.split(b"\n", 1)
-                    line = line_bytes.decode("utf-8", errors="replace").strip()
-                    if not line:
-                        continue
-                    if "service=llm" in line:
-                        logger.info("opencode LLM: %s", line)
-                    elif "service=provider" in line and "found" in line:
-                        logger.debug("opencode provider: %s", line)
-                    elif "ERR" in line or "error" in line.lower():
-                        logger.warning("opencode stderr: %s", line)
-                    else:
-                        logger.debug("opencode: %s", line)
+            async for line_bytes in _iter_lines(self._process.stderr):
+                line = line_bytes.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                if "service=llm" in line:
+                    logger.info("opencode LLM: %s", line)
+                elif "service=provider" in line and "found" in line:
+                    logger.debug("opencode provider: %s", line)
+                elif "ERR" in line or "error" in line.lower():
+                    logger.warning("opencode stderr: %s", line)
+                else:
+                    logger.debug("opencode: %s", line)
         except anyio.ClosedResourceError:
             pass
         except Exception as exc:
@@ -97,32 +124,34 @@ class SubprocessTransport:
 
     async def write(self, data: dict[str, Any]) -> None:
         """Write a JSON-RPC message (NDJSON line) to the subprocess stdin."""
+        await self.write_bytes(_json.dumps(data) + b"\n")
+
+    async def write_bytes(self, payload: bytes) -> None:
+        """Write an already-encoded NDJSON line (ending in ``\\n``) to stdin."""
         if self._process is None or self._process.stdin is None:
             raise ProcessError("Transport not connected", exit_code=1)
 
-        line = json.dumps(data, separators=(",", ":")) + "\n"
-        logger.debug(">>> %s", line.rstrip())
-        await self._process.stdin.send(line.encode("utf-8"))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(">>> %s", payload[:-1].decode("utf-8", errors="replace"))
+        await self._process.stdin.send(payload)
 
     async def read_messages(self) -> AsyncIterator[dict[str, Any]]:
         """Async generator reading NDJSON lines from subprocess stdout."""
         if self._process is None or self._process.stdout is None:
             raise ProcessError("Transport not connected", exit_code=1)
 
-        buffer = b""
-        async for chunk in self._process.stdout:
-            buffer += chunk
-            while b"\n" in buffer:
-                line, buffer = buffer.split(b"\n", 1)
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    msg = json.loads(line)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        async for line in _iter_lines(self._process.stdout):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                msg = _json.loads(line)
+                if debug:
                     logger.debug("<<< %s", msg)
-                    yield msg
-                except json.JSONDecodeError:
-                    logger.warning("Non-JSON line from subprocess: %s", line[:200])
+                yield msg
+            except ValueError:
+                logger.warning("Non-JSON line from subprocess: %s", line[:200])
 
     async def close(self) -> None:
         """Shut down the subprocess."""
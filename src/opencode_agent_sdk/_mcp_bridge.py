@@ -52,7 +52,7 @@ class McpHttpBridge:
         """
         from .tools import _TOOL_REGISTRY
 
-        tool_handlers = _TOOL_REGISTRY.get(name, [])
+        tool_handlers = list(_TOOL_REGISTRY.get(name, {}).values())
         if not tool_handlers:
             raise ValueError(f"No tool handlers registered for MCP server '{name}'")
 
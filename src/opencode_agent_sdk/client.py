@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass, field
-from typing import Any, AsyncIterable, AsyncIterator
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator
 
 from .types import (
     AssistantMessage,
@@ -14,6 +14,9 @@ from .types import (
 )
 from ._errors import ProcessError
 
+if TYPE_CHECKING:
+    import httpx
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,6 +39,10 @@ class AgentOptions:
     # HTTP mode: set to opencode serve URL (e.g. "http://localhost:54321")
     # When set, uses HTTP transport instead of subprocess ACP.
     server_url: str = ""
+    # HTTP mode: optional client (base_url set to server_url) to share one
+    # connection pool between SDKClients. The transport never closes an
+    # injected client; the caller owns it and closes it when done.
+    http_client: httpx.AsyncClient | None = None
 
 
 class SDKClient:
@@ -79,7 +86,10 @@ class SDKClient:
         """Connect via HTTP to a running opencode serve instance."""
         from ._internal.http_transport import HTTPTransport
 
-        self._transport = HTTPTransport(base_url=self._options.server_url)
+        self._transport = HTTPTransport(
+            base_url=self._options.server_url,
+            client=self._options.http_client,
+        )
         await self._transport.connect(cwd=self._options.cwd)
 
     async def _connect_subprocess(self) -> None:
@@ -189,13 +199,14 @@ class SDKClient:
             parts = [{"type": "text", "text": prompt}]
         else:
             parts = []
+            append = parts.append
             async for item in prompt:
                 if isinstance(item, str):
-                    parts.append({"type": "text", "text": item})
+                    append({"type": "text", "text": item})
                 elif isinstance(item, dict):
-                    parts.append(item)
+                    append(item)
                 else:
-                    parts.append({"type": "text", "text": str(item)})
+                    append({"type": "text", "text": str(item)})
 
         if self._http_mode:
             # HTTP mode: store parts; actual send happens in receive_response
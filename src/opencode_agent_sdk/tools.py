@@ -57,18 +57,26 @@ def create_sdk_mcp_server(
 
         server = create_sdk_mcp_server("my-tools", tools=[my_tool])
         options = AgentOptions(mcp_servers={"my-tools": server})
+
+    Raises ValueError if two tools share a name.
     """
     tool_list = tools or []
+    by_name: dict[str, SdkMcpTool] = {}
     tool_defs = []
     for t in tool_list:
+        if t.name in by_name:
+            raise ValueError(
+                f"Duplicate tool name {t.name!r} in MCP server {name!r}"
+            )
+        by_name[t.name] = t
         tool_defs.append({
             "name": t.name,
             "description": t.description,
             "inputSchema": t.input_schema,
         })
 
-    # Store tools for the in-process MCP server runner
-    _TOOL_REGISTRY[name] = tool_list
+    # Store tools for the in-process MCP server runner, keyed by tool name
+    _TOOL_REGISTRY[name] = by_name
 
     return {
         "command": sys.executable,
@@ -78,5 +86,10 @@ def create_sdk_mcp_server(
     }
 
 
-# Global registry for in-process tool serving
-_TOOL_REGISTRY: dict[str, list[SdkMcpTool]] = {}
+# Global registry for in-process tool serving: server name → tool name → tool
+_TOOL_REGISTRY: dict[str, dict[str, SdkMcpTool]] = {}
+
+
+def get_tool(server_name: str, tool_name: str) -> SdkMcpTool | None:
+    """Look up a tool registered via create_sdk_mcp_server, or None."""
+    return _TOOL_REGISTRY.get(server_name, {}).get(tool_name)
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from typing import Any, Callable
 
 
-@dataclass
+@dataclass(slots=True)
 class Usage:
     """Usage stats for a response."""
     input_tokens: int = 0
@@ -13,13 +13,13 @@ class Usage:
     cache_read_input_tokens: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TextBlock:
     text: str
     type: str = "text"
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolUseBlock:
     id: str
     name: str
@@ -27,13 +27,13 @@ class ToolUseBlock:
     type: str = "tool_use"
 
 
-@dataclass
+@dataclass(slots=True)
 class AssistantMessage:
     content: list[TextBlock | ToolUseBlock]
     role: str = "assistant"
 
 
-@dataclass
+@dataclass(slots=True)
 class ResultMessage:
     usage: Usage = field(default_factory=Usage)
     total_cost_usd: float = 0.0
@@ -43,13 +43,13 @@ class ResultMessage:
     is_error: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class SystemMessage:
     subtype: str
     data: dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class HookMatcher:
     matcher: str | None
     hooks: list[Callable[..., Any]]
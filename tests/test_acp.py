@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import unittest
+from typing import Any
+
+from opencode_agent_sdk._internal.acp import ACPSession
+from opencode_agent_sdk.types import (
+    AssistantMessage,
+    HookMatcher,
+    ResultMessage,
+    SystemMessage,
+    TextBlock,
+    ToolUseBlock,
+)
+
+
+def _update(session_update: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "method": "session/update",
+        "params": {"sessionId": "s1", "update": session_update},
+    }
+
+
+def _chunk(text: str) -> dict[str, Any]:
+    return _update({
+        "sessionUpdate": "agent_message_chunk",
+        "content": {"type": "text", "text": text},
+    })
+
+
+async def _collect(updates: list[dict[str, Any]]) -> list[Any]:
+    """Feed notifications into a session and collect one turn's messages."""
+    session = ACPSession(transport=None)  # type: ignore[arg-type]
+    session._session_id = "s1"
+    for msg in updates:
+        await session._handle_message(msg)
+    await session._update_queue.put({"_prompt_done": True, "_result": {}})
+    return [message async for message in session.receive_messages()]
+
+
+def _texts(messages: list[Any]) -> list[str]:
+    return [
+        block.text
+        for message in messages
+        if isinstance(message, AssistantMessage)
+        for block in message.content
+        if isinstance(block, TextBlock)
+    ]
+
+
+class ReceiveMessagesTests(unittest.TestCase):
+    def collect(self, updates: list[dict[str, Any]]) -> list[Any]:
+        return asyncio.run(_collect(updates))
+
+    def test_text_chunks_yield_accumulated_text(self) -> None:
+        messages = self.collect([_chunk("Hel"), _chunk("lo")])
+        self.assertEqual(_texts(messages)[-1], "Hello")
+        self.assertIsInstance(messages[-1], ResultMessage)
+        self.assertEqual(messages[-1].session_id, "s1")
+
+    def test_queued_text_chunks_are_coalesced(self) -> None:
+        messages = self.collect([_chunk("a"), _chunk("b"), _chunk("c")])
+        # One streamed message, then the end-of-turn flush
+        self.assertEqual(_texts(messages), ["abc", "abc"])
+
+    def test_coalescing_stops_at_other_updates(self) -> None:
+        messages = self.collect([
+            _chunk("a"),
+            _chunk("b"),
+            _update({"sessionUpdate": "plan", "entries": []}),
+            _chunk("c"),
+        ])
+        self.assertEqual(_texts(messages), ["ab", "abc", "abc"])
+        self.assertIsInstance(messages[1], SystemMessage)
+
+    def test_tool_call_flushes_text_and_yields_tool_use(self) -> None:
+        messages = self.collect([
+            _chunk("Looking"),
+            _update({
+                "sessionUpdate": "tool_call",
+                "toolCallId": "t1",
+                "title": "bash",
+                "rawInput": {"command": "ls"},
+            }),
+            _update({
+                "sessionUpdate": "tool_call_update",
+                "toolCallId": "t1",
+                "status": "completed",
+            }),
+        ])
+        tool_uses = [
+            block
+            for message in messages
+            if isinstance(message, AssistantMessage)
+            for block in message.content
+            if isinstance(block, ToolUseBlock)
+        ]
+        self.assertEqual(len(tool_uses), 1)
+        self.assertEqual(tool_uses[0].id, "t1")
+        self.assertEqual(tool_uses[0].name, "bash")
+        self.assertEqual(tool_uses[0].input, {"command": "ls"})
+        self.assertIn("Looking", _texts(messages))
+
+    def test_tool_call_update_without_start_uses_update_title(self) -> None:
+        messages = self.collect([
+            _update({
+                "sessionUpdate": "tool_call_update",
+                "toolCallId": "t9",
+                "title": "read",
+                "status": "failed",
+            }),
+        ])
+        block = messages[0].content[0]
+        self.assertIsInstance(block, ToolUseBlock)
+        self.assertEqual((block.id, block.name, block.input), ("t9", "read", {}))
+
+    def test_plan_and_usage_updates(self) -> None:
+        messages = self.collect([
+            _update({"sessionUpdate": "plan", "entries": [{"content": "a"}]}),
+            _update({
+                "sessionUpdate": "usage_update",
+                "used": 5,
+                "size": 100,
+                "cost": {"amount": 0.25},
+            }),
+        ])
+        self.assertIsInstance(messages[0], SystemMessage)
+        self.assertEqual(messages[0].data, {"entries": [{"content": "a"}]})
+        self.assertEqual(messages[-1].total_cost_usd, 0.25)
+
+    def test_unknown_update_type_is_ignored(self) -> None:
+        messages = self.collect([_update({"sessionUpdate": "mystery"})])
+        self.assertEqual(len(messages), 1)
+        self.assertIsInstance(messages[0], ResultMessage)
+
+    def test_unknown_update_type_is_not_queued(self) -> None:
+        async def queued() -> int:
+            session = ACPSession(transport=None)  # type: ignore[arg-type]
+            await session._handle_message(_update({"sessionUpdate": "mystery"}))
+            await session._handle_message(_chunk("hi"))
+            return session._update_queue.qsize()
+
+        self.assertEqual(asyncio.run(queued()), 1)
+
+
+_OPTIONS = [
+    {"optionId": "allow-1", "kind": "allow_once"},
+    {"optionId": "reject-1", "kind": "reject_once"},
+]
+
+
+async def _decide(
+    matchers: list[HookMatcher], tool_name: str,
+) -> tuple[str, list[dict[str, Any]]]:
+    """Run a requestPermission through the hooks; return (optionId, sent)."""
+    session = ACPSession(transport=None, hooks={"PreToolUse": matchers})  # type: ignore[arg-type]
+    sent: list[dict[str, Any]] = []
+
+    async def send_response(req_id: Any, result: dict[str, Any]) -> None:
+        sent.append(result)
+
+    session._send_response = send_response  # type: ignore[method-assign]
+    await session._handle_message({
+        "jsonrpc": "2.0",
+        "id": 7,
+        "method": "requestPermission",
+        "params": {
+            "toolCall": {"toolCallId": "t1", "title": tool_name, "rawInput": {}},
+            "options": _OPTIONS,
+        },
+    })
+    return sent[-1]["outcome"]["optionId"], sent
+
+
+class PermissionRequestTests(unittest.TestCase):
+    def test_allows_without_hooks(self) -> None:
+        option_id, _ = asyncio.run(_decide([], "bash"))
+        self.assertEqual(option_id, "allow-1")
+
+    def test_matching_hook_denies(self) -> None:
+        deny = lambda *_: {"permissionDecision": "deny"}  # noqa: E731
+        option_id, _ = asyncio.run(_decide([HookMatcher("bash", [deny])], "bash"))
+        self.assertEqual(option_id, "reject-1")
+
+    def test_hooks_for_other_tools_are_skipped(self) -> None:
+        deny = lambda *_: {"permissionDecision": "deny"}  # noqa: E731
+        option_id, _ = asyncio.run(_decide([HookMatcher("edit", [deny])], "bash"))
+        self.assertEqual(option_id, "allow-1")
+
+    def test_matchers_run_in_registration_order(self) -> None:
+        calls: list[str] = []
+
+        def record(name: str) -> Any:
+            async def hook(*_: Any) -> dict[str, Any]:
+                calls.append(name)
+                return {}
+            return hook
+
+        matchers = [
+            HookMatcher("bash", [record("specific")]),
+            HookMatcher(None, [record("wildcard")]),
+            HookMatcher("edit", [record("other")]),
+        ]
+        asyncio.run(_decide(matchers, "bash"))
+        self.assertEqual(calls, ["specific", "wildcard"])
+
+
+class ResponseRoutingTests(unittest.TestCase):
+    def test_routes_result_and_error_by_id(self) -> None:
+        async def route() -> tuple[Any, BaseException | None]:
+            session = ACPSession(transport=None)  # type: ignore[arg-type]
+            loop = asyncio.get_running_loop()
+            ok, failed = loop.create_future(), loop.create_future()
+            session._response_futures = {1: ok, 2: failed}
+            await session._handle_message({"jsonrpc": "2.0", "id": 1, "result": {"x": 1}})
+            await session._handle_message(
+                {"jsonrpc": "2.0", "id": 2, "error": {"code": -32600}},
+            )
+            # Unknown ids are dropped quietly
+            await session._handle_message({"jsonrpc": "2.0", "id": 99, "result": {}})
+            self.assertEqual(session._response_futures, {})
+            return ok.result(), failed.exception()
+
+        result, error = asyncio.run(route())
+        self.assertEqual(result, {"x": 1})
+        self.assertIsInstance(error, RuntimeError)
+
+
+class RecordingTransport:
+    """Captures the NDJSON lines an ACPSession writes."""
+
+    def __init__(self) -> None:
+        self.lines: list[bytes] = []
+
+    async def write_bytes(self, payload: bytes) -> None:
+        self.lines.append(payload)
+
+
+class OutgoingMessageTests(unittest.TestCase):
+    def send(self, method: str, *args: Any) -> dict[str, Any]:
+        transport = RecordingTransport()
+        session = ACPSession(transport=transport)  # type: ignore[arg-type]
+        asyncio.run(getattr(session, method)(*args))
+        (line,) = transport.lines
+        self.assertTrue(line.endswith(b"}\n"))
+        return json.loads(line)
+
+    def test_response_envelope(self) -> None:
+        msg = self.send("_send_response", 3, {"outcome": {"optionId": "é"}})
+        self.assertEqual(
+            msg, {"jsonrpc": "2.0", "id": 3, "result": {"outcome": {"optionId": "é"}}},
+        )
+
+    def test_response_to_string_id(self) -> None:
+        self.assertEqual(self.send("_send_response", "abc", {})["id"], "abc")
+
+    def test_notification_envelope(self) -> None:
+        msg = self.send("_send_notification", "session/cancel", {"sessionId": "s1"})
+        self.assertEqual(
+            msg,
+            {"jsonrpc": "2.0", "method": "session/cancel", "params": {"sessionId": "s1"}},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import unittest
+
+import httpx
+
+from opencode_agent_sdk import AgentOptions, SDKClient
+from opencode_agent_sdk._errors import ProcessError
+from opencode_agent_sdk._internal.http_transport import HTTPTransport
+from opencode_agent_sdk.types import AssistantMessage, ResultMessage
+
+
+class FakeStreamResponse:
+    """Stands in for an httpx streaming response with fixed body chunks."""
+
+    def __init__(self, chunks: list[bytes]) -> None:
+        self._chunks = chunks
+
+    async def aiter_bytes(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+def _event(payload: dict, newline: bytes = b"\n") -> bytes:
+    return b"data: " + json.dumps(payload).encode() + newline + newline
+
+
+def _parse(chunks: list[bytes]) -> list[dict]:
+    async def collect() -> list[dict]:
+        response = FakeStreamResponse(chunks)
+        return [event async for event in HTTPTransport._parse_sse(response)]
+
+    return asyncio.run(collect())
+
+
+class ParseSSETests(unittest.TestCase):
+    def test_parses_multiple_events_in_one_chunk(self) -> None:
+        body = _event({"n": 1}) + _event({"n": 2}) + _event({"n": 3})
+        self.assertEqual(_parse([body]), [{"n": 1}, {"n": 2}, {"n": 3}])
+
+    def test_event_split_across_chunks(self) -> None:
+        body = _event({"text": "hello world"}) + _event({"n": 2})
+        chunks = [body[i:i + 3] for i in range(0, len(body), 3)]
+        self.assertEqual(_parse(chunks), [{"text": "hello world"}, {"n": 2}])
+
+    def test_crlf_line_endings(self) -> None:
+        body = _event({"n": 1}, b"\r\n") + _event({"n": 2}, b"\r\n")
+        # Split between every CR and LF so boundaries straddle reads.
+        chunks = [body[i:i + 1] for i in range(len(body))]
+        self.assertEqual(_parse(chunks), [{"n": 1}, {"n": 2}])
+
+    def test_crlf_boundary_split_after_each_byte_pair(self) -> None:
+        body = _event({"n": 1}, b"\r\n") + _event({"n": 2}, b"\r\n")
+        chunks = [body[i:i + 2] for i in range(0, len(body), 2)]
+        self.assertEqual(_parse(chunks), [{"n": 1}, {"n": 2}])
+
+    def test_multiline_data_and_non_data_fields(self) -> None:
+        body = b'event: message\nid: 7\ndata: {"a":\ndata: 1}\n\n'
+        self.assertEqual(_parse([body]), [{"a": 1}])
+
+    def test_skips_invalid_json_and_comment_only_events(self) -> None:
+        body = b": keepalive\n\ndata: not-json\n\n" + _event({"ok": True})
+        self.assertEqual(_parse([body]), [{"ok": True}])
+
+    def test_incomplete_trailing_event_is_dropped(self) -> None:
+        body = _event({"n": 1}) + b'data: {"n": 2}\n'
+        self.assertEqual(_parse([body]), [{"n": 1}])
+
+
+class TranslateSSEPartTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.transport = HTTPTransport("http://127.0.0.1:1")
+        self.seen_len: dict[str, int] = {}
+        self.tool_states: dict[str, str] = {}
+
+    def tearDown(self) -> None:
+        asyncio.run(self.transport.close())
+
+    def translate(self, part: dict):
+        return self.transport._translate_sse_part(part, self.seen_len, self.tool_states)
+
+    def test_cumulative_text_yields_deltas(self) -> None:
+        deltas = [
+            self.translate({"type": "text", "id": "p1", "text": text})
+            for text in ("Hel", "Hello", "Hello", "Hello!")
+        ]
+        self.assertEqual(deltas[0].content[0].text, "Hel")
+        self.assertEqual(deltas[1].content[0].text, "lo")
+        self.assertIsNone(deltas[2])
+        self.assertEqual(deltas[3].content[0].text, "!")
+
+    def test_tool_status_transitions_emit_once_each(self) -> None:
+        def tool(status: str, **state) -> dict:
+            return {"type": "tool", "id": "t1", "callID": "c1", "tool": "bash",
+                    "state": {"status": status, **state}}
+
+        results = [
+            self.translate(tool("pending")),
+            self.translate(tool("running", input={"command": "ls"})),
+            self.translate(tool("running", input={"command": "ls"})),
+            self.translate(tool("completed", output="a\nb")),
+            self.translate(tool("completed", output="a\nb")),
+        ]
+        self.assertIsNone(results[0])
+        self.assertEqual(results[1].content[0].id, "c1")
+        self.assertEqual(results[1].content[0].input, {"command": "ls"})
+        self.assertIsNone(results[2])
+        self.assertEqual(results[3].subtype, "tool_result")
+        self.assertEqual(results[3].data["output"], "a\nb")
+        self.assertIsNone(results[4])
+
+    def test_text_parts_are_tracked_independently(self) -> None:
+        self.translate({"type": "text", "id": "p1", "text": "abc"})
+        msg = self.translate({"type": "text", "id": "p2", "text": "xyz"})
+        self.assertEqual(msg.content[0].text, "xyz")
+
+
+class TranslatePartsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.transport = HTTPTransport("http://127.0.0.1:1")
+
+    def tearDown(self) -> None:
+        asyncio.run(self.transport.close())
+
+    def test_translates_each_known_part_type_in_order(self) -> None:
+        messages = self.transport.translate_parts([
+            {"type": "step-start", "id": "s0"},
+            {"type": "text", "text": "hi"},
+            {"type": "tool-invocation", "toolInvocationId": "c1",
+             "toolName": "bash", "input": {"command": "ls"}},
+            {"type": "tool-result", "toolInvocationId": "c1", "toolName": "bash",
+             "result": [{"type": "text", "text": "a"}, {"type": "image"},
+                        {"type": "text", "text": "b"}]},
+            {"type": "reasoning", "text": "skipped"},
+            {"type": "step-finish", "cost": 0.1, "sessionID": "ses1"},
+        ])
+        self.assertEqual(
+            [type(m).__name__ for m in messages],
+            ["SystemMessage", "AssistantMessage", "AssistantMessage",
+             "SystemMessage", "ResultMessage"],
+        )
+        self.assertEqual(messages[1].content[0].text, "hi")
+        self.assertEqual(messages[2].content[0].input, {"command": "ls"})
+        self.assertEqual(messages[3].data["output"], "ab")
+        self.assertEqual(messages[4].session_id, "ses1")
+
+    def test_string_tool_result_and_lazy_iteration(self) -> None:
+        parts = iter([{"type": "tool-result", "id": "c2", "result": "done"}])
+        (msg,) = self.transport.itranslate_parts(parts)
+        self.assertEqual(msg.data, {"tool_name": "", "tool_id": "c2", "output": "done"})
+
+
+class _HangingStream(httpx.AsyncByteStream):
+    """An SSE body that sends a comment and then never ends."""
+
+    async def __aiter__(self):
+        yield b": connected\n\n"
+        await asyncio.sleep(3600)
+
+
+class _OpenStream(httpx.AsyncByteStream):
+    """An SSE body that sends fixed events and then stays open."""
+
+    def __init__(self, body: bytes) -> None:
+        self._body = body
+
+    async def __aiter__(self):
+        yield self._body
+        await asyncio.sleep(3600)
+
+
+def _part_event(part: dict) -> bytes:
+    part = {"sessionID": "ses1", **part}
+    return _event({"type": "message.part.updated", "properties": {"part": part}})
+
+
+class ClientOwnershipTests(unittest.IsolatedAsyncioTestCase):
+    async def test_injected_client_is_left_open(self) -> None:
+        async with httpx.AsyncClient(
+            base_url="http://opencode.test",
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+        ) as client:
+            transport = HTTPTransport("http://opencode.test", client=client)
+            await transport.close()
+            self.assertFalse(client.is_closed)
+
+    async def test_sdk_client_passes_http_client_through(self) -> None:
+        async with httpx.AsyncClient(
+            base_url="http://opencode.test",
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, json={"id": "ses1"}),
+            ),
+        ) as client:
+            sdk = SDKClient(options=AgentOptions(
+                server_url="http://opencode.test", http_client=client,
+            ))
+            await sdk.connect()
+            self.assertIs(sdk._transport._client, client)
+            await sdk.disconnect()
+            self.assertFalse(client.is_closed)
+
+    async def test_own_client_is_closed(self) -> None:
+        transport = HTTPTransport("http://opencode.test")
+        await transport.close()
+        self.assertTrue(transport._client.is_closed)
+
+
+class ChatStreamTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.sent: list[tuple[str, dict]] = []
+
+    async def run_turn(self, sse_body, message_status: int = 200) -> list:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/session":
+                return httpx.Response(200, json={"id": "ses1"})
+            if request.url.path == "/event":
+                if isinstance(sse_body, bytes):
+                    return httpx.Response(200, content=sse_body)
+                return httpx.Response(200, stream=sse_body)
+            if request.url.path == "/session/ses1/message":
+                self.sent.append((request.headers["content-type"], json.loads(request.content)))
+                self.message_timeout = request.extensions["timeout"]
+                return httpx.Response(message_status, json={})
+            return httpx.Response(200, json={})
+
+        async with httpx.AsyncClient(
+            base_url="http://opencode.test",
+            transport=httpx.MockTransport(handler),
+        ) as client:
+            transport = HTTPTransport("http://opencode.test", client=client)
+            await transport.connect()
+            try:
+                return [
+                    msg async for msg in transport.chat_stream(
+                        [{"type": "text", "text": "hi"}],
+                    )
+                ]
+            finally:
+                await transport.close()
+
+    async def test_streams_text_and_result_until_idle(self) -> None:
+        body = (
+            _part_event({"id": "p1", "type": "text", "text": "Hel"})
+            + _part_event({"id": "p1", "type": "text", "text": "Hello"})
+            + _event({"type": "message.part.updated", "properties": {
+                "part": {"sessionID": "other", "id": "x", "type": "text", "text": "no"},
+            }})
+            + _part_event({"id": "s", "type": "step-finish", "cost": 0.5,
+                           "tokens": {"input": 3, "output": 4}})
+            + _event({"type": "session.idle", "properties": {"sessionID": "ses1"}})
+        )
+        messages = await self.run_turn(body)
+        texts = [m.content[0].text for m in messages if isinstance(m, AssistantMessage)]
+        self.assertEqual(texts, ["Hel", "lo"])
+        self.assertIsInstance(messages[-1], ResultMessage)
+        self.assertEqual(messages[-1].total_cost_usd, 0.5)
+        self.assertEqual(self.sent, [(
+            "application/json",
+            {"parts": [{"type": "text", "text": "hi"}], "providerID": "anthropic"},
+        )])
+
+    async def test_idle_ends_turn_while_event_stream_stays_open(self) -> None:
+        body = (
+            _part_event({"id": "p1", "type": "text", "text": "Hi"})
+            + _event({"type": "session.idle", "properties": {"sessionID": "ses1"}})
+        )
+        messages = await asyncio.wait_for(self.run_turn(_OpenStream(body)), 5)
+        self.assertEqual(messages[0].content[0].text, "Hi")
+
+    async def test_message_post_has_no_read_timeout(self) -> None:
+        # The POST returns only when the turn ends, which can outlast the
+        # transport's default timeout.
+        body = _event({"type": "session.idle", "properties": {"sessionID": "ses1"}})
+        await self.run_turn(body)
+        self.assertIsNone(self.message_timeout["read"])
+        self.assertEqual(self.message_timeout["connect"], 10.0)
+
+    async def test_session_error_raises(self) -> None:
+        body = _event({"type": "session.error", "properties": {
+            "sessionID": "ses1", "error": {"name": "Boom"},
+        }})
+        with self.assertRaisesRegex(ProcessError, "Boom"):
+            await self.run_turn(body)
+
+    async def test_rejected_message_raises_instead_of_hanging(self) -> None:
+        with self.assertRaisesRegex(ProcessError, "HTTP 400"):
+            await asyncio.wait_for(
+                self.run_turn(_HangingStream(), message_status=400), 5,
+            )
+
+    async def test_rejected_message_after_idle_raises(self) -> None:
+        body = _event({"type": "session.idle", "properties": {"sessionID": "ses1"}})
+        with self.assertRaisesRegex(ProcessError, "HTTP 500"):
+            await self.run_turn(body, message_status=500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import unittest
+
+from opencode_agent_sdk.tools import (
+    _TOOL_REGISTRY,
+    create_sdk_mcp_server,
+    get_tool,
+    tool,
+)
+
+
+@tool(name="greet", description="Say hello")
+def greet(name: str) -> str:
+    return f"Hello, {name}!"
+
+
+@tool(name="add", description="Add numbers", input_schema={"type": "object"})
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+class ToolRegistryTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        _TOOL_REGISTRY.pop("test-tools", None)
+
+    def test_tools_are_looked_up_by_name(self) -> None:
+        create_sdk_mcp_server("test-tools", tools=[greet, add])
+        self.assertIs(get_tool("test-tools", "add"), add)
+        self.assertIs(get_tool("test-tools", "greet"), greet)
+        self.assertIsNone(get_tool("test-tools", "missing"))
+        self.assertIsNone(get_tool("no-such-server", "add"))
+        # Registration order is kept for serving
+        self.assertEqual(list(_TOOL_REGISTRY["test-tools"]), ["greet", "add"])
+
+    def test_duplicate_tool_names_are_rejected(self) -> None:
+        @tool(name="add", description="Another add")
+        def other_add(a: int, b: int) -> int:
+            return a + b
+
+        with self.assertRaisesRegex(ValueError, "'add'"):
+            create_sdk_mcp_server("test-tools", tools=[add, greet, other_add])
+        self.assertNotIn("test-tools", _TOOL_REGISTRY)
+
+    def test_server_config_lists_tool_definitions(self) -> None:
+        server = create_sdk_mcp_server("test-tools", version="2.0", tools=[greet])
+        self.assertEqual(server["_version"], "2.0")
+        self.assertEqual(server["_tools"], [{
+            "name": "greet",
+            "description": "Say hello",
+            "inputSchema": {"type": "object", "properties": {}},
+        }])
+
+
+if __name__ == "__main__":
+    unittest.main()
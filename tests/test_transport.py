@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import unittest
+
+from opencode_agent_sdk._internal.transport import SubprocessTransport
+
+
+class FakeStream:
+    """Async-iterable stand-in for a subprocess pipe yielding fixed chunks."""
+
+    def __init__(self, chunks: list[bytes]) -> None:
+        self._chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+class FakeProcess:
+    def __init__(self, stdout: list[bytes]) -> None:
+        self.stdin = None
+        self.stdout = FakeStream(stdout)
+        self.stderr = None
+
+
+def _read(chunks: list[bytes]) -> list[dict]:
+    async def collect() -> list[dict]:
+        transport = SubprocessTransport()
+        transport._process = FakeProcess(chunks)  # type: ignore[assignment]
+        return [msg async for msg in transport.read_messages()]
+
+    return asyncio.run(collect())
+
+
+def _line(payload: dict) -> bytes:
+    return json.dumps(payload).encode() + b"\n"
+
+
+class ReadMessagesTests(unittest.TestCase):
+    def test_reads_many_lines_from_one_chunk(self) -> None:
+        body = _line({"id": 1}) + _line({"id": 2}) + _line({"id": 3})
+        self.assertEqual(_read([body]), [{"id": 1}, {"id": 2}, {"id": 3}])
+
+    def test_line_split_across_chunks(self) -> None:
+        body = _line({"method": "session/update", "params": {"text": "héllo"}})
+        chunks = [body[i:i + 4] for i in range(0, len(body), 4)]
+        self.assertEqual(
+            _read(chunks),
+            [{"method": "session/update", "params": {"text": "héllo"}}],
+        )
+
+    def test_long_line_over_many_chunks(self) -> None:
+        body = _line({"output": "x" * 100_000}) + _line({"id": 2})
+        chunks = [body[i:i + 4096] for i in range(0, len(body), 4096)]
+        messages = _read(chunks)
+        self.assertEqual(len(messages[0]["output"]), 100_000)
+        self.assertEqual(messages[1], {"id": 2})
+
+    def test_skips_blank_and_non_json_lines(self) -> None:
+        body = b"\n  \r\nnot json\n" + _line({"ok": True}).replace(b"\n", b"\r\n")
+        self.assertEqual(_read([body]), [{"ok": True}])
+
+    def test_unterminated_trailing_line_is_dropped(self) -> None:
+        self.assertEqual(_read([_line({"id": 1}) + b'{"id": 2}']), [{"id": 1}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,14 @@
 from __future__ import annotations
 import unittest
-from opencode_agent_sdk.types import ResultMessage, Usage
+from opencode_agent_sdk.types import (
+    AssistantMessage,
+    HookMatcher,
+    ResultMessage,
+    SystemMessage,
+    TextBlock,
+    ToolUseBlock,
+    Usage,
+)
 
 class TestTypes(unittest.TestCase):
     def test_result_message_usage_robustness(self):
@@ -18,5 +26,18 @@ class TestTypes(unittest.TestCase):
         self.assertEqual(usage.output_tokens, 0)
         self.assertIsNone(usage.cache_read_input_tokens)
 
+    def test_sdk_types_use_slots(self):
+        # Streamed messages are created per delta; no per-instance __dict__
+        for obj in (
+            TextBlock(text="hi"),
+            ToolUseBlock(id="t1", name="bash", input={}),
+            AssistantMessage(content=[]),
+            ResultMessage(),
+            SystemMessage(subtype="init"),
+            Usage(),
+            HookMatcher(matcher=None, hooks=[]),
+        ):
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj).__name__)
+
 if __name__ == "__main__":
     unittest.main()